@@ -1,12 +1,12 @@
-from math import floor
-import matplotlib.pyplot as plt
+import math
 
+import altair as alt
 import streamlit as st
 import pandas as pd
 import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
-from src.black_scholes import black_scholes_option_price
+from src.black_scholes import OptionChainPrices, black_scholes_option_prices
 
 st.title("Welcome to Option Trader's Toolkit")
 
@@ -23,7 +23,7 @@ ratio = st.number_input(
 )
 
 # Get the current price of the stock
-@st.cache_data
+@st.cache_data(ttl=3600)
 def get_90_days_history_for_ticker(ticker: str) -> pd.DataFrame:
     return yf.Ticker(ticker).history(period="90d")
 
@@ -31,7 +31,11 @@ def get_90_days_history_for_ticker(ticker: str) -> pd.DataFrame:
 price_history = get_90_days_history_for_ticker(ticker)
 period_high = price_history["High"].max()
 period_low = price_history["Low"].min()
-historical_vola = price_history["Close"].pct_change().std() * np.sqrt(252)
+closes = price_history["Close"].to_numpy()
+# Skip missing closes so a single NaN row does not spread into the volatility
+closes = closes[np.isfinite(closes)]
+daily_returns = closes[1:] / closes[:-1] - 1.0
+historical_vola = daily_returns.std(ddof=1) * math.sqrt(252)
 
 last_price = price_history.iloc[-1]["Close"]
 
@@ -43,17 +47,16 @@ historical_vola = st.number_input(
 last_price = st.number_input("Last Price", value=last_price)
 
 # Print a small summary of the stock
-summary = pd.DataFrame(
-    {
-        "Last Price": last_price,
-        "Period High": period_high,
-        "Period Low": period_low,
-        "Trading Range (%)": (period_high / period_low - 1.0) * 100.0,
-        "Historical Volatility (%)": historical_vola,
-    },
-    index=[ticker],
-)
-st.table(summary)
+summary = {
+    "Last Price": last_price,
+    "Period High": period_high,
+    "Period Low": period_low,
+    "Trading Range (%)": (period_high / period_low - 1.0) * 100.0,
+    "Historical Volatility (%)": historical_vola,
+}
+st.subheader(ticker)
+for column, (label, value) in zip(st.columns(len(summary)), summary.items()):
+    column.metric(label, f"{value:.2f}")
 
 # Add a date picker to select a date
 # Either by a date or by number of days from today
@@ -61,7 +64,7 @@ default_date = datetime.utcnow() + timedelta(weeks=20)
 date = st.date_input("Select a date", default_date)
 days_to_expiry = (date - datetime.utcnow().date()).days
 st.write(f"Days to expiry: {days_to_expiry}")
-bs_mu = np.exp(
+bs_mu = math.exp(
     ((risk_free_rate / 100.0) - 0.5 * (historical_vola / 100.0) ** 2) * days_to_expiry / 365.0
 )
 
@@ -76,87 +79,75 @@ strike_range_step = st.number_input(
     "Enter a strike range step size", value=10.0
 )
 
-def round_strike(strike: float) -> float:
-    """Floors the strike to the nearest multiple of steps"""
-    return strike_range_step * np.floor(strike / strike_range_step)
+# Default to +-20% around the last price, floored to a multiple of the step
+default_strike_range_start = strike_range_step * math.floor(last_price * 0.8 / strike_range_step)
+default_strike_range_end = strike_range_step * math.floor(last_price * 1.2 / strike_range_step)
 
 strike_range_start = st.number_input(
-    "Enter a starting strike", value=round_strike(last_price * 0.8), step=strike_range_step
+    "Enter a starting strike", value=default_strike_range_start, step=strike_range_step
 )
 strike_range_end = st.number_input(
-    "Enter an ending strike", value=round_strike(last_price * 1.2), step=strike_range_step
+    "Enter an ending strike", value=default_strike_range_end, step=strike_range_step
 )
 dollars_to_invest = st.number_input(
     "Enter the amount of dollars to invest", value=1000.0, step=100.0
 )
 
 strikes = np.arange(
-    strike_range_start, strike_range_end + strike_range_step, strike_range_step
+    strike_range_start, strike_range_end + strike_range_step, strike_range_step, dtype=np.float64
 )
 
-# Calculate all option prices in the strike grid
-option_prices = {
-    "Strike": [],
-    "Call Price": [],
-    "Call Delta": [],
-    "Put Price": [],
-    "Put Delta": [],
-    "Vega": []
-}
-
 vola = float(historical_vola) / 100.0
 r = float(risk_free_rate) / 100.0
 years_to_expiry = float(days_to_expiry) / 365.0
 
-for strike in strikes:
-    option_prices["Strike"].append(int(strike))
-
-    # First for the call
-    price, delta, _ = black_scholes_option_price(
-        years_to_expiry=years_to_expiry,
-        strike=strike,
-        spot=last_price,
-        volatility=vola,
-        interest_rate=r,
-        is_call=True,
-    )
-
-    option_prices["Call Price"].append(price * ratio / eur_usd)
-    option_prices["Call Delta"].append(delta)
-
-    # Then for the put
-    price, delta, vega = black_scholes_option_price(
+# Calculate all option prices in the strike grid at once, cached so that
+# changing e.g. the ratio or the exchange rate does not reprice the chain
+@st.cache_data
+def price_option_chain(
+    years_to_expiry: float,
+    strikes: tuple[float, ...],
+    spot: float,
+    volatility: float,
+    interest_rate: float,
+) -> OptionChainPrices:
+    return black_scholes_option_prices(
         years_to_expiry=years_to_expiry,
-        strike=strike,
-        spot=last_price,
-        volatility=vola,
-        interest_rate=r,
-        is_call=False,
+        strikes=np.asarray(strikes, dtype=np.float64),
+        spot=spot,
+        volatility=volatility,
+        interest_rate=interest_rate,
     )
 
-    option_prices["Put Price"].append(price * ratio / eur_usd)
-    option_prices["Put Delta"].append(delta)
-    option_prices["Vega"].append(vega * ratio)
 
+chain = price_option_chain(
+    years_to_expiry=years_to_expiry,
+    strikes=tuple(strikes.tolist()),
+    spot=last_price,
+    volatility=vola,
+    interest_rate=r,
+)
 
-option_prices = pd.DataFrame(option_prices)
+option_prices = pd.DataFrame(
+    {
+        "Strike": strikes.astype(np.int64),
+        "Call Price": chain.call_price * ratio / eur_usd,
+        "Call Delta": chain.call_delta,
+        "Put Price": chain.put_price * ratio / eur_usd,
+        "Put Delta": chain.put_delta,
+        "Vega": chain.vega * ratio,
+    },
+    copy=False,
+)
 option_prices["Distance to Strike (%)"] = (option_prices["Strike"] / last_price - 1.0) * 100.0
 
-for idx, row in option_prices.iterrows():
-    puts_per_call = -row['Call Delta'] / row['Put Delta']
-
-    max_options = floor(
-        dollars_to_invest / (row['Call Price'] + row['Put Price'] * puts_per_call)
-    )
-
-    call_break_even = row['Strike'] + row['Call Price'] / ratio
-    put_break_even = row['Strike'] - row['Put Price'] / ratio
-
-    option_prices.loc[idx, "Call Break Even"] = call_break_even
-    option_prices.loc[idx, "Put Break Even"] = put_break_even
-    option_prices.loc[idx, "Puts per Call"] = puts_per_call
+option_prices["Call Break Even"] = option_prices["Strike"] + option_prices["Call Price"] / ratio
+option_prices["Put Break Even"] = option_prices["Strike"] - option_prices["Put Price"] / ratio
+option_prices["Puts per Call"] = -option_prices["Call Delta"] / option_prices["Put Delta"]
 
-    # option_prices.loc[idx, "Max Options"] = max_options
+# option_prices["Max Options"] = np.floor(
+#     dollars_to_invest / (option_prices["Call Price"] + option_prices["Put Price"] * option_prices["Puts per Call"])
+# )
 
 option_prices["Vega per Straddle"] = 2 * option_prices["Vega"] / (
     option_prices["Call Price"] + option_prices["Put Price"] * option_prices["Puts per Call"]
@@ -174,15 +165,18 @@ df = option_prices.style.highlight_max(subset=["Vega per Straddle"], color="ligh
 st.table(df)
 
 # Plot the option prices
-fig, ax = plt.subplots(figsize=(10, 7))
-ax.plot(option_prices.index, option_prices["Call Price"], label="Call")
-ax.plot(option_prices.index, option_prices["Put Price"], label="Put")
-ax.plot(option_prices.index, option_prices["Vega per Straddle"], label="Vega per Straddle")
-
-ax.set_xlabel("Strike")
-ax.set_ylabel("Option Price")
-ax.legend()
+chart_data = (
+    option_prices[["Call Price", "Put Price", "Vega per Straddle"]]
+    .rename(columns={"Call Price": "Call", "Put Price": "Put"})
+    .reset_index()
+    .melt("Strike", var_name="Series", value_name="Option Price")
+)
+lines = alt.Chart(chart_data).mark_line().encode(
+    x="Strike:Q", y="Option Price:Q", color="Series:N"
+)
 
 # Add a vertical line for the current price
-ax.axvline(last_price, color="black", linestyle="--")
-st.pyplot(fig)
+last_price_rule = alt.Chart(pd.DataFrame({"Last Price": [last_price]})).mark_rule(
+    color="black", strokeDash=[4, 4]
+).encode(x="Last Price:Q")
+st.altair_chart(lines + last_price_rule, use_container_width=True)
@@ -1,47 +1,76 @@
+import math
+from typing import NamedTuple
+
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+
+class OptionChainPrices(NamedTuple):
+    """Black-Scholes prices and greeks of calls and puts over a strike grid."""
+
+    call_price: np.ndarray
+    call_delta: np.ndarray
+    put_price: np.ndarray
+    put_delta: np.ndarray
+    vega: np.ndarray
+
 
+# Standard normal cumulative distribution function (CDF), ndtr is the plain
+# ufunc behind norm.cdf without the rv_continuous dispatch overhead
+standard_normal_cdf = ndtr
 
-def standard_normal_cdf(x: float) -> float:
-    """Returns the standard normal cumulative distribution function (CDF)"""
-    return norm.cdf(x)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
 
 
-def black_scholes_option_price(
+def black_scholes_option_prices(
     years_to_expiry: float,
-    strike: float,
+    strikes: np.ndarray,
     spot: float,
     volatility: float,
     interest_rate: float,
-    is_call: bool,
-) -> tuple[float, float, float]:
-    """Returns the Black-Scholes option price, vega and delta."""
+) -> OptionChainPrices:
+    """Returns the Black-Scholes call and put prices, deltas and vega for all strikes."""
 
+    strikes = np.asarray(strikes, dtype=np.float64)
+
+    # Checked once per chain, the vectorized pricing below assumes they hold
     assert years_to_expiry > 0
-    assert strike > 0
+    assert (strikes > 0).all()
     assert spot > 0
     assert volatility > 0
     assert interest_rate > 0
 
+    # Strike independent terms are plain floats, computed once per chain
+    sqrt_t = math.sqrt(years_to_expiry)
+    vol_sqrt_t = volatility * sqrt_t
+    drift = (interest_rate + 0.5 * volatility * volatility) * years_to_expiry
+    discount = math.exp(-interest_rate * years_to_expiry)
+
     # Calculate the d1 and d2 parameters
-    d1 = (
-                 np.log(spot / strike)
-                 + (interest_rate + 0.5 * volatility**2) * years_to_expiry
-    ) / (volatility * np.sqrt(years_to_expiry))
-    d2 = d1 - volatility * np.sqrt(years_to_expiry)
-
-    # Calculate the option price
-    if is_call:
-        price = spot * standard_normal_cdf(d1) - strike * np.exp(
-            -interest_rate * years_to_expiry
-        ) * standard_normal_cdf(d2)
-        delta = standard_normal_cdf(d1)
-        vega = spot * np.sqrt(years_to_expiry) * standard_normal_cdf(d1)
-    else:
-        price = strike * np.exp(-interest_rate * years_to_expiry) * standard_normal_cdf(
-            -d2
-        ) - spot * standard_normal_cdf(-d1)
-        delta = -standard_normal_cdf(-d1)
-        vega = spot * np.sqrt(years_to_expiry) * standard_normal_cdf(d1)
-
-    return price, delta, vega
+    d1 = (np.log(spot / strikes) + drift) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+
+    # One ufunc call for all CDFs. The put side uses N(-d) directly since
+    # 1 - N(d) loses the tail once N(d) rounds to 1
+    nd1, nd2, n_minus_d1, n_minus_d2 = standard_normal_cdf(
+        np.stack([d1, d2, -d1, -d2])
+    )
+
+    # Calculate the option prices, calls and puts share d1, d2 and the
+    # discounted strikes. Put-call parity is not used for the put as
+    # call - S + K * exp(-rT) cancels out the put's value deep in the tail
+    discounted_strikes = strikes * discount
+    call_price = spot * nd1 - discounted_strikes * nd2
+    put_price = discounted_strikes * n_minus_d2 - spot * n_minus_d1
+    call_delta = nd1
+    put_delta = -n_minus_d1
+    # Vega uses the standard normal PDF of d1 and is the same for calls and puts
+    vega = spot * sqrt_t * INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+
+    return OptionChainPrices(
+        call_price=call_price,
+        call_delta=call_delta,
+        put_price=put_price,
+        put_delta=put_delta,
+        vega=vega,
+    )